@@ -6,8 +6,6 @@ from backend.models import (
     Category,
     Product,
     ProductInfo,
-    Parameter,
-    ProductParameter,
     Order,
     OrderItem,
     Contact,
@@ -15,6 +13,21 @@ from backend.models import (
 )
 
 
+class ChangeListOnlyMixin:
+    # Columns loaded for changelist rows; change forms still fetch the whole row
+    # so that editing does not trigger a query per deferred field.
+    list_only = ()
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        match = request.resolver_match
+
+        if self.list_only and match and str(match.url_name).endswith("_changelist"):
+            queryset = queryset.only(*self.list_only)
+
+        return queryset
+
+
 @admin.register(User)
 class UserAdmin(admin.ModelAdmin):
     pass
@@ -27,7 +40,18 @@ class ShopAdmin(admin.ModelAdmin):
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
-    pass
+    list_display = (
+        "name",
+        "shop_names",
+    )
+    raw_id_fields = ("shops",)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).prefetch_related("shops")
+
+    @admin.display(description="Продавцы")
+    def shop_names(self, obj):
+        return ", ".join(shop.name for shop in obj.shops.all())
 
 
 @admin.register(Product)
@@ -36,39 +60,81 @@ class ProductAdmin(admin.ModelAdmin):
 
 
 @admin.register(ProductInfo)
-class ProductInfoAdmin(admin.ModelAdmin):
-    pass
-
-
-@admin.register(Parameter)
-class ParameterAdmin(admin.ModelAdmin):
-    pass
+class ProductInfoAdmin(ChangeListOnlyMixin, admin.ModelAdmin):
+    list_display = (
+        "name",
+        "product",
+        "seller",
+        "quantity",
+        "price",
+    )
+    raw_id_fields = ("product", "seller")
+    list_per_page = 25
+    show_full_result_count = False
+    list_only = ("name", "price", "quantity", "product__name", "seller__name")
 
-
-@admin.register(ProductParameter)
-class ProductParameterAdmin(admin.ModelAdmin):
-    pass
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related("product", "seller")
 
 
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
-    pass
+    list_display = (
+        "dt",
+        "user",
+        "state",
+    )
+    raw_id_fields = ("user",)
+    list_per_page = 25
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related("user__user")
 
 
 @admin.register(OrderItem)
-class OrderItemAdmin(admin.ModelAdmin):
-    pass
+class OrderItemAdmin(ChangeListOnlyMixin, admin.ModelAdmin):
+    list_display = (
+        "order",
+        "product",
+        "shop",
+        "quantity",
+    )
+    raw_id_fields = ("product", "order", "shop")
+    list_per_page = 25
+    show_full_result_count = False
+    list_only = ("quantity", "order__dt", "product__id", "shop__name")
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related("order", "product", "shop")
 
 
 @admin.register(Contact)
-class ContactAdmin(admin.ModelAdmin):
-    pass
+class ContactAdmin(ChangeListOnlyMixin, admin.ModelAdmin):
+    list_display = (
+        "phone",
+        "address",
+        "user",
+    )
+    raw_id_fields = ("user",)
+    list_only = ("phone", "address", "user__email")
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related("user")
 
 
 @admin.register(ConfirmEmailToken)
 class ConfirmEmailTokenAdmin(admin.ModelAdmin):
     list_display = (
-        "user",
+        "user_email",
         "key",
         "created_at",
     )
+    raw_id_fields = ("user",)
+    list_per_page = 25
+    show_full_result_count = False
+    list_select_related = ("user",)
+
+    @admin.display(description="Почта", ordering="user__email")
+    def user_email(self, obj):
+        return obj.user.email
@@ -0,0 +1,22 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+
+class EmailBackend(ModelBackend):
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        email = kwargs.get("email")
+        if email is None and username and "@" in username:
+            email = username
+        if email is None or password is None:
+            return None
+
+        UserModel = get_user_model()
+        try:
+            user = UserModel._default_manager.get(email__iexact=email)
+        except UserModel.DoesNotExist:
+            # Run the default password hasher once to reduce the timing
+            # difference between an existing and a nonexistent user.
+            UserModel().set_password(password)
+        else:
+            if user.check_password(password) and self.user_can_authenticate(user):
+                return user
@@ -0,0 +1,31 @@
+from django.core.cache import cache
+from django.db import transaction
+
+from backend.models import Category, Seller, Product
+
+
+LIST_CACHE_TIMEOUT = 300
+
+CACHED_LISTS = {
+    Category: ("categories", "products"),
+    Product: ("products",),
+    Seller: ("sellers",),
+}
+
+
+def list_cache_key(name, page):
+    version = cache.get_or_set(f"list:{name}:version", 1, timeout=None)
+    return f"list:{name}:{version}:{page}"
+
+
+def bump_list_versions(names):
+    for name in names:
+        key = f"list:{name}:version"
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+
+def invalidate_list_cache(*names):
+    # Bumping before commit would let a concurrent read cache the old rows
+    # under the new version.
+    transaction.on_commit(lambda: bump_list_versions(names))
@@ -0,0 +1,24 @@
+# Generated by Django 4.1.6 on 2026-10-14 04:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("backend", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["user", "state"], name="backend_ord_user_id_c92ec3_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["state", "dt"], name="backend_ord_state_18a1bf_idx"
+            ),
+        ),
+    ]
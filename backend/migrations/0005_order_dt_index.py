@@ -0,0 +1,17 @@
+# Generated by Django 4.1.6 on 2026-10-14 04:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("backend", "0003_user_email_upper_idx"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="order",
+            name="dt",
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+    ]
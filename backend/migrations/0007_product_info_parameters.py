@@ -0,0 +1,35 @@
+# Generated by Django 4.1.6 on 2026-10-14 04:26
+
+from django.db import migrations, models
+
+
+def copy_product_parameters(apps, schema_editor):
+    ProductInfo = apps.get_model("backend", "ProductInfo")
+    ProductParameter = apps.get_model("backend", "ProductParameter")
+    grouped = {}
+
+    for product_info_id, name, value in ProductParameter.objects.values_list(
+        "product_info_id", "parameter__name", "value"
+    ).iterator():
+        grouped.setdefault(product_info_id, {})[name] = value
+
+    product_infos = list(ProductInfo.objects.filter(id__in=grouped))
+    for product_info in product_infos:
+        product_info.parameters = grouped[product_info.id]
+
+    ProductInfo.objects.bulk_update(product_infos, ["parameters"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("backend", "0005_order_dt_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="productinfo",
+            name="parameters",
+            field=models.JSONField(blank=True, default=dict, verbose_name="Параметры"),
+        ),
+        migrations.RunPython(copy_product_parameters, migrations.RunPython.noop),
+    ]
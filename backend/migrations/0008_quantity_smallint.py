@@ -0,0 +1,22 @@
+# Generated by Django 4.1.6 on 2026-10-14 04:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("backend", "0007_product_info_parameters"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="orderitem",
+            name="quantity",
+            field=models.PositiveSmallIntegerField(verbose_name="Кол-во"),
+        ),
+        migrations.AlterField(
+            model_name="productinfo",
+            name="quantity",
+            field=models.PositiveSmallIntegerField(verbose_name="Кол-во"),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.1.6 on 2026-10-14 04:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("backend", "0008_quantity_smallint"),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name="order",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("state", "basket")),
+                fields=("user",),
+                name="order_active_basket_unique",
+            ),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 4.1.6 on 2026-10-14 04:34
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def merge_duplicate_product_infos(apps, schema_editor):
+    ProductInfo = apps.get_model("backend", "ProductInfo")
+    OrderItem = apps.get_model("backend", "OrderItem")
+    duplicates = list(
+        ProductInfo.objects.values("seller_id", "article")
+        .annotate(keep_id=Max("id"), count=Count("id"))
+        .filter(count__gt=1)
+        .order_by()
+    )
+
+    # The newest row is the one the last catalog upload wrote, order items
+    # pointing at the older copies are moved onto it before they are deleted.
+    for duplicate in duplicates:
+        stale = ProductInfo.objects.filter(
+            seller_id=duplicate["seller_id"], article=duplicate["article"]
+        ).exclude(id=duplicate["keep_id"])
+        OrderItem.objects.filter(product__in=stale).update(
+            product_id=duplicate["keep_id"]
+        )
+        stale.delete()
+
+
+class Migration(migrations.Migration):
+    # The cleanup is committed on its own, PostgreSQL refuses to alter a table
+    # that still has pending deferred foreign key checks.
+    atomic = False
+
+    dependencies = [
+        ("backend", "0010_order_active_basket_unique"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            merge_duplicate_product_infos, migrations.RunPython.noop, atomic=True
+        ),
+        migrations.AddConstraint(
+            model_name="productinfo",
+            constraint=models.UniqueConstraint(
+                fields=("seller", "article"), name="product_info_seller_article_unique"
+            ),
+        ),
+    ]
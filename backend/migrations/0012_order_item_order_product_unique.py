@@ -0,0 +1,40 @@
+# Generated by Django 4.1.6 on 2026-10-14 04:37
+
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+
+def merge_duplicate_order_items(apps, schema_editor):
+    OrderItem = apps.get_model("backend", "OrderItem")
+    duplicates = list(
+        OrderItem.objects.values("order_id", "product_id")
+        .annotate(keep_id=Min("id"), total=Sum("quantity"), count=Count("id"))
+        .filter(count__gt=1)
+        .order_by()
+    )
+
+    # Repeated basket lines are folded into the oldest one, capped at the
+    # smallint range of the quantity column.
+    for duplicate in duplicates:
+        OrderItem.objects.filter(id=duplicate["keep_id"]).update(
+            quantity=min(duplicate["total"], 32767)
+        )
+        OrderItem.objects.filter(
+            order_id=duplicate["order_id"], product_id=duplicate["product_id"]
+        ).exclude(id=duplicate["keep_id"]).delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("backend", "0011_product_info_seller_article_unique"),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_order_items, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="orderitem",
+            constraint=models.UniqueConstraint(
+                fields=("order", "product"), name="order_item_order_product_unique"
+            ),
+        ),
+    ]
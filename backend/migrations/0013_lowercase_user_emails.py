@@ -0,0 +1,33 @@
+# Generated by Django 4.1.6 on 2026-10-14 04:44
+
+from django.db import migrations
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+
+def lowercase_emails(apps, schema_editor):
+    User = apps.get_model("backend", "User")
+    collisions = list(
+        User.objects.values(lower_email=Lower("email"))
+        .annotate(count=Count("id"))
+        .filter(count__gt=1)
+        .order_by()
+        .values_list("lower_email", flat=True)
+    )
+    if collisions:
+        raise RuntimeError(
+            "Accounts whose emails differ only by case must be merged or "
+            "renamed before migrating: " + ", ".join(collisions)
+        )
+
+    User.objects.exclude(email=Lower("email")).update(email=Lower("email"))
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("backend", "0012_order_item_order_product_unique"),
+    ]
+
+    operations = [
+        migrations.RunPython(lowercase_emails, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.1.6 on 2026-10-14 04:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("backend", "0013_lowercase_user_emails"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="confirmemailtoken",
+            name="key",
+            field=models.CharField(max_length=64, unique=True, verbose_name="Key"),
+        ),
+    ]
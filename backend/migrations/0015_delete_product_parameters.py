@@ -0,0 +1,18 @@
+# Generated by Django 4.1.6 on 2026-10-14 04:58
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("backend", "0014_token_key_unique_only"),
+    ]
+
+    operations = [
+        migrations.DeleteModel(
+            name="ProductParameter",
+        ),
+        migrations.DeleteModel(
+            name="Parameter",
+        ),
+    ]
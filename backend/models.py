@@ -1,9 +1,11 @@
+from secrets import token_hex
+
 from django.db import models
+from django.db.models import F, Q
+from django.db.models.functions import Upper
 from django.contrib.auth.models import AbstractUser
 from django.utils.translation import gettext_lazy as _
 
-from django_rest_passwordreset.tokens import get_token_generator
-
 
 STATE_CHOICES = (
     ("basket", "В корзине"),
@@ -20,6 +22,11 @@ USER_TYPE_CHOICES = (
     ("buyer", "Покупатель"),
 )
 
+STATE_CHOICES_MAP = dict(STATE_CHOICES)
+USER_TYPE_CHOICES_MAP = dict(USER_TYPE_CHOICES)
+
+MAX_QUANTITY = 32767
+
 
 class User(AbstractUser):
     EMAIL_FIELD = "email"
@@ -32,6 +39,17 @@ class User(AbstractUser):
     class Meta:
         verbose_name = "Пользователь"
         verbose_name_plural = "Пользователи"
+        indexes = [
+            models.Index(Upper("email"), name="user_email_upper_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.email:
+            self.email = self.email.lower()
+        return super(User, self).save(*args, **kwargs)
+
+    def display_type(self):
+        return USER_TYPE_CHOICES_MAP.get(self.type, self.type)
 
     def __str__(self):
         return self.email
@@ -124,47 +142,28 @@ class ProductInfo(models.Model):
         blank=True,
         on_delete=models.CASCADE,
     )
-    quantity = models.PositiveIntegerField(verbose_name="Кол-во")
+    quantity = models.PositiveSmallIntegerField(verbose_name="Кол-во")
     price = models.PositiveIntegerField(verbose_name="Цена")
     price_rrc = models.PositiveIntegerField(verbose_name="РРЦ")
     article = models.PositiveIntegerField(verbose_name="Артикул")
+    parameters = models.JSONField(verbose_name="Параметры", default=dict, blank=True)
 
     class Meta:
         verbose_name = "Информация"
         verbose_name_plural = "Информация"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["seller", "article"], name="product_info_seller_article_unique"
+            ),
+        ]
 
-
-class Parameter(models.Model):
-    name = models.CharField(max_length=64, verbose_name="Название")
-
-    class Meta:
-        verbose_name = "Параметр"
-        verbose_name_plural = "Параметры"
-
-    def __str__(self):
-        return self.name
-
-
-class ProductParameter(models.Model):
-    product_info = models.ForeignKey(
-        ProductInfo,
-        verbose_name="Информация",
-        related_name="product_parameters",
-        blank=True,
-        on_delete=models.CASCADE,
-    )
-    parameter = models.ForeignKey(
-        Parameter,
-        verbose_name="Параметр",
-        related_name="product_parameters",
-        blank=True,
-        on_delete=models.CASCADE,
-    )
-    value = models.CharField(max_length=64, verbose_name="Значение")
-
-    class Meta:
-        verbose_name = "Параметр"
-        verbose_name_plural = "Параметры"
+    @classmethod
+    def reserve(cls, pk, quantity):
+        if quantity < 1:
+            raise ValueError(f"invalid quantity {quantity!r}")
+        return cls.objects.filter(pk=pk, quantity__gte=quantity).update(
+            quantity=F("quantity") - quantity
+        )
 
 
 class Order(models.Model):
@@ -175,7 +174,7 @@ class Order(models.Model):
         blank=True,
         on_delete=models.CASCADE,
     )
-    dt = models.DateTimeField(auto_now_add=True)
+    dt = models.DateTimeField(auto_now_add=True, db_index=True)
     state = models.CharField(
         verbose_name="Статус", choices=STATE_CHOICES, max_length=16
     )
@@ -183,6 +182,20 @@ class Order(models.Model):
     class Meta:
         verbose_name = "Заказ"
         verbose_name_plural = "Заказы"
+        indexes = [
+            models.Index(fields=["user", "state"]),
+            models.Index(fields=["state", "dt"]),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user"],
+                condition=Q(state="basket"),
+                name="order_active_basket_unique",
+            ),
+        ]
+
+    def display_state(self):
+        return STATE_CHOICES_MAP.get(self.state, self.state)
 
     def __str__(self):
         return str(self.dt)
@@ -210,11 +223,16 @@ class OrderItem(models.Model):
         blank=True,
         on_delete=models.CASCADE,
     )
-    quantity = models.PositiveIntegerField(verbose_name="Кол-во")
+    quantity = models.PositiveSmallIntegerField(verbose_name="Кол-во")
 
     class Meta:
         verbose_name = "Заказанная позиция"
         verbose_name_plural = "Заказанные позиции"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["order", "product"], name="order_item_order_product_unique"
+            ),
+        ]
 
 
 class ConfirmEmailToken(models.Model):
@@ -224,7 +242,7 @@ class ConfirmEmailToken(models.Model):
 
     @staticmethod
     def generate_key():
-        return get_token_generator().generate_token()
+        return token_hex(32)
 
     user = models.ForeignKey(
         User,
@@ -237,12 +255,17 @@ class ConfirmEmailToken(models.Model):
         auto_now_add=True, verbose_name=_("Generation time")
     )
 
-    key = models.CharField(_("Key"), max_length=64, db_index=True, unique=True)
+    key = models.CharField(_("Key"), max_length=64, unique=True)
 
     def save(self, *args, **kwargs):
         if not self.key:
             self.key = self.generate_key()
         return super(ConfirmEmailToken, self).save(*args, **kwargs)
 
+    @classmethod
+    def bulk_issue(cls, users):
+        tokens = [cls(user=user, key=cls.generate_key()) for user in users]
+        return cls.objects.bulk_create(tokens, batch_size=1000)
+
     def __str__(self):
-        return "Password reset token for user {user}".format(user=self.user)
+        return "Password reset token for user {user_id}".format(user_id=self.user_id)
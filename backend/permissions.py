@@ -0,0 +1,12 @@
+from rest_framework.permissions import BasePermission
+
+
+class IsSeller(BasePermission):
+    message = "Only for sellers"
+
+    def has_permission(self, request, view):
+        return bool(
+            request.user
+            and request.user.is_authenticated
+            and getattr(request.user, "type", None) == "seller"
+        )
@@ -1,10 +1,10 @@
 from rest_framework import serializers
+from rest_framework.validators import UniqueValidator
 
 from backend.models import (
     User,
     Product,
     ProductInfo,
-    ProductParameter,
     OrderItem,
     Contact,
     Order,
@@ -28,17 +28,9 @@ class ProductSerializer(serializers.ModelSerializer):
         fields = ["name", "category"]
 
 
-class ProductParameterSerializer(serializers.ModelSerializer):
-    parameter = serializers.StringRelatedField()
-
-    class Meta:
-        model = ProductParameter
-        fields = ["parameter", "value"]
-
-
 class ProductInfoSerializer(serializers.ModelSerializer):
     product = ProductSerializer(read_only=True)
-    product_parameters = ProductParameterSerializer(read_only=True, many=True)
+    product_parameters = serializers.SerializerMethodField()
 
     class Meta:
         model = ProductInfo
@@ -54,8 +46,18 @@ class ProductInfoSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["id"]
 
+    def get_product_parameters(self, obj):
+        return [
+            {"parameter": name, "value": value}
+            for name, value in obj.parameters.items()
+        ]
+
 
 class OrderItemSerializer(serializers.ModelSerializer):
+    product_info = serializers.PrimaryKeyRelatedField(
+        source="product", queryset=ProductInfo.objects.all()
+    )
+
     class Meta:
         model = OrderItem
         fields = ["id", "product_info", "quantity", "order"]
@@ -64,7 +66,7 @@ class OrderItemSerializer(serializers.ModelSerializer):
 
 
 class OrderItemCreateSerializer(OrderItemSerializer):
-    product_info = ProductInfoSerializer(read_only=True)
+    product_info = ProductInfoSerializer(source="product", read_only=True)
 
 
 class ContactSerializer(serializers.ModelSerializer):
@@ -76,6 +78,10 @@ class ContactSerializer(serializers.ModelSerializer):
 
 
 class UserSerializer(serializers.ModelSerializer):
+    email = serializers.EmailField(
+        max_length=254,
+        validators=[UniqueValidator(queryset=User.objects.all(), lookup="iexact")],
+    )
     contacts = ContactSerializer(read_only=True, many=True)
 
     class Meta:
@@ -83,6 +89,9 @@ class UserSerializer(serializers.ModelSerializer):
         fields = ["id", "email", "type", "contacts"]
         read_only_fields = ["id"]
 
+    def validate_email(self, value):
+        return value.lower()
+
 
 class SellerSerializer(serializers.ModelSerializer):
     class Meta:
@@ -93,7 +102,7 @@ class SellerSerializer(serializers.ModelSerializer):
 
 class OrderSerializer(serializers.ModelSerializer):
     ordered_items = OrderItemCreateSerializer(read_only=True, many=True)
-    contact = ContactSerializer(read_only=True)
+    contact = ContactSerializer(source="user", read_only=True)
     total_sum = serializers.IntegerField()
 
     class Meta:
@@ -1,16 +1,28 @@
 from django.conf import settings
 from django.core.mail import EmailMultiAlternatives
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver, Signal
 
 from django_rest_passwordreset.signals import reset_password_token_created
 
-from backend.models import ConfirmEmailToken, User
+from backend.cache import CACHED_LISTS, invalidate_list_cache
+from backend.models import ConfirmEmailToken, User, Category, Seller, Product
 
 
 new_user_registered = Signal()
 new_order = Signal()
 
 
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Product)
+@receiver(post_save, sender=Seller)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Product)
+@receiver(post_delete, sender=Seller)
+def list_data_changed(sender, **kwargs):
+    invalidate_list_cache(*CACHED_LISTS[sender])
+
+
 @receiver(reset_password_token_created)
 def password_reset_token_created(sender, instance, reset_password_token, **kwargs):
     msg = EmailMultiAlternatives(
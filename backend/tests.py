@@ -1,3 +1,613 @@
-from django.test import TestCase
+from io import BytesIO
+from unittest import mock
 
-# Create your tests here.
+from requests import ConnectTimeout, HTTPError
+from orjson import dumps as dump_json
+from django.core import mail
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from backend.backends import EmailBackend
+from backend.models import (
+    User,
+    Category,
+    Seller,
+    Product,
+    ProductInfo,
+    Order,
+    OrderItem,
+    Contact,
+    ConfirmEmailToken,
+)
+
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+CATALOG = """
+seller: Связной
+categories:
+  - id: 224
+    name: Смартфоны
+goods:
+  - id: 4216292
+    category: 224
+    model: apple/iphone/xs-max
+    name: Смартфон Apple iPhone XS Max 512GB (золотистый)
+    price: 110000
+    price_rrc: 116990
+    quantity: 14
+    parameters:
+      Диагональ (дюйм): 6.5
+      Цвет: золотистый
+{extra}
+"""
+
+EXTRA_GOODS = """
+  - id: 4216313
+    category: 224
+    model: apple/iphone/xr
+    name: Смартфон Apple iPhone XR 256GB (красный)
+    price: 65000
+    price_rrc: 69990
+    quantity: 9
+    parameters:
+      Цвет: красный
+"""
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ProductInfoViewTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(
+            username="seller", email="seller@example.com", type="seller"
+        )
+        self.seller = Seller.objects.create(name="Связной", user=user, state=True)
+
+    def create_product_info(self, article):
+        category = Category.objects.create(name=f"Категория {article}")
+        product = Product.objects.create(name=f"Продукт {article}", category=category)
+        return ProductInfo.objects.create(
+            name=f"Модель {article}",
+            product=product,
+            seller=self.seller,
+            article=article,
+            quantity=1,
+            price=100,
+            price_rrc=120,
+            parameters={"Цвет": "чёрный"},
+        )
+
+    def get_products(self, **params):
+        with CaptureQueriesContext(connection) as context:
+            response = APIClient().get("/api/v1/products", params)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries), response.json()
+
+    def test_query_count_does_not_grow_with_rows(self):
+        self.create_product_info(1)
+        single_count, data = self.get_products()
+        self.assertEqual(len(data), 1)
+
+        self.create_product_info(2)
+        self.create_product_info(3)
+        many_count, data = self.get_products()
+        self.assertEqual(len(data), 3)
+
+        self.assertEqual(single_count, many_count)
+
+    def test_filters_by_seller_and_category(self):
+        product_info = self.create_product_info(1)
+        self.create_product_info(2)
+
+        _, data = self.get_products(
+            seller_id=self.seller.id, category_id=product_info.product.category_id
+        )
+        self.assertEqual([row["id"] for row in data], [product_info.id])
+
+    def test_parameters_are_served_from_product_info(self):
+        self.create_product_info(1)
+        _, data = self.get_products()
+        self.assertEqual(
+            data[0]["product_parameters"], [{"parameter": "Цвет", "value": "чёрный"}]
+        )
+
+
+class ProductInfoReserveTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(
+            username="seller", email="seller@example.com", type="seller"
+        )
+        self.product_info = ProductInfo.objects.create(
+            name="Модель",
+            product=Product.objects.create(
+                name="Продукт", category=Category.objects.create(name="Категория")
+            ),
+            seller=Seller.objects.create(name="Связной", user=user),
+            article=1,
+            quantity=5,
+            price=100,
+            price_rrc=120,
+        )
+
+    def stock(self):
+        self.product_info.refresh_from_db()
+        return self.product_info.quantity
+
+    def test_reserve(self):
+        self.assertEqual(ProductInfo.reserve(self.product_info.id, 3), 1)
+        self.assertEqual(self.stock(), 2)
+        self.assertEqual(ProductInfo.reserve(self.product_info.id, 3), 0)
+        self.assertEqual(self.stock(), 2)
+
+    def test_reserve_rejects_non_positive_quantity(self):
+        for quantity in (0, -40000):
+            with self.subTest(quantity=quantity):
+                with self.assertRaises(ValueError):
+                    ProductInfo.reserve(self.product_info.id, quantity)
+        self.assertEqual(self.stock(), 5)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CatalogViewTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="seller", email="seller@example.com", type="seller"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def upload(self, catalog, fetch_error=None, status_error=None):
+        with mock.patch("backend.views.SESSION") as session:
+            session.get.side_effect = fetch_error
+            response = session.get.return_value.__enter__.return_value
+            response.raise_for_status.side_effect = status_error
+            response.raw = BytesIO(catalog.encode())
+            return self.client.post(
+                "/api/v1/seller/update", {"url": "http://example.com/shop.yaml"}
+            )
+
+    def test_reupload_keeps_ids_and_removes_dropped_articles(self):
+        response = self.upload(CATALOG.format(extra=EXTRA_GOODS))
+        self.assertEqual(response.json(), {"Status": True})
+        ids = dict(ProductInfo.objects.values_list("article", "id"))
+        self.assertEqual(set(ids), {4216292, 4216313})
+
+        response = self.upload(
+            CATALOG.format(extra="").replace("quantity: 14", "quantity: 11")
+        )
+        self.assertEqual(response.json(), {"Status": True})
+        product_info = ProductInfo.objects.get()
+        self.assertEqual(product_info.id, ids[4216292])
+        self.assertEqual(product_info.quantity, 11)
+        self.assertEqual(
+            product_info.parameters, {"Диагональ (дюйм)": "6.5", "Цвет": "золотистый"}
+        )
+        self.assertEqual(Product.objects.count(), 2)
+        self.assertEqual(Seller.objects.count(), 1)
+
+    def test_fetch_failures_are_reported(self):
+        for error in (
+            {"fetch_error": ConnectTimeout("timed out")},
+            {"status_error": HTTPError("502 Server Error")},
+        ):
+            with self.subTest(**error):
+                response = self.upload(CATALOG.format(extra=""), **error)
+                self.assertEqual(response.status_code, 200)
+                self.assertFalse(response.json()["Status"])
+
+        self.assertFalse(Seller.objects.exists())
+
+    def test_malformed_catalog_is_reported(self):
+        for catalog in ("goods: [", "<html>Bad Gateway</html>", "seller: Связной"):
+            with self.subTest(catalog=catalog):
+                response = self.upload(catalog)
+                self.assertEqual(response.status_code, 200)
+                self.assertFalse(response.json()["Status"])
+
+        self.assertFalse(Seller.objects.exists())
+
+    def test_quantity_out_of_range_is_rejected(self):
+        for quantity in ("-1", "40000", "много"):
+            with self.subTest(quantity=quantity):
+                response = self.upload(
+                    CATALOG.format(extra="").replace(
+                        "quantity: 14", f"quantity: {quantity}"
+                    )
+                )
+                self.assertFalse(response.json()["Status"])
+
+        self.assertFalse(ProductInfo.objects.exists())
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class BasketViewTests(TransactionTestCase):
+    # Fresh sequences keep the contact ids out of line with the user ids, the
+    # seller's contacts take the ids the buyer's user id would match.
+    reset_sequences = True
+
+    def setUp(self):
+        seller_user = User.objects.create_user(
+            username="seller", email="seller@example.com", type="seller"
+        )
+        for phone in ("+79990000001", "+79990000002"):
+            Contact.objects.create(user=seller_user, address="Казань", phone=phone)
+        seller = Seller.objects.create(name="Связной", user=seller_user, state=True)
+        category = Category.objects.create(name="Смартфоны")
+        self.product_infos = [
+            ProductInfo.objects.create(
+                name=f"Модель {article}",
+                product=Product.objects.create(
+                    name=f"Продукт {article}", category=category
+                ),
+                seller=seller,
+                article=article,
+                quantity=10,
+                price=100 * article,
+                price_rrc=120 * article,
+            )
+            for article in (1, 2)
+        ]
+
+        self.user = User.objects.create_user(
+            username="buyer", email="buyer@example.com"
+        )
+        self.contact = Contact.objects.create(
+            user=self.user, address="Москва", phone="+79990000000"
+        )
+        self.assertNotEqual(self.contact.id, self.user.id)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def add(self, *items):
+        return self.client.post(
+            "/api/v1/basket",
+            {
+                "items": dump_json(
+                    [
+                        {"product_info": product_info.id, "quantity": quantity}
+                        for product_info, quantity in items
+                    ]
+                ).decode()
+            },
+        ).json()
+
+    def basket_items(self):
+        return dict(
+            OrderItem.objects.filter(
+                order__user=self.contact, order__state="basket"
+            ).values_list("product_id", "quantity")
+        )
+
+    def test_add(self):
+        first, second = self.product_infos
+        self.assertEqual(
+            self.add((first, 2), (second, 1)), {"Status": True, "Created objects": 2}
+        )
+        self.assertEqual(self.add((first, 5)), {"Status": True, "Created objects": 0})
+        self.assertEqual(self.basket_items(), {first.id: 2, second.id: 1})
+        self.assertEqual(Order.objects.filter(state="basket").count(), 1)
+
+    def test_add_rejects_out_of_range_quantity(self):
+        first, _ = self.product_infos
+        self.assertFalse(self.add((first, 0))["Status"])
+        self.assertFalse(self.add((first, 40000))["Status"])
+        self.assertEqual(self.basket_items(), {})
+
+    def test_add_requires_a_contact(self):
+        self.contact.delete()
+        first, _ = self.product_infos
+        self.assertFalse(self.add((first, 1))["Status"])
+        self.assertFalse(Order.objects.exists())
+
+    def update(self, items):
+        return self.client.put("/api/v1/basket", {"items": items}).json()
+
+    def test_update(self):
+        first, second = self.product_infos
+        self.add((first, 2), (second, 1))
+        order_item = OrderItem.objects.get(product=first)
+
+        response = self.update(
+            dump_json([{"id": order_item.id, "quantity": 7}]).decode()
+        )
+        self.assertEqual(response, {"Status": True, "Updated objects": 1})
+        self.assertEqual(self.basket_items(), {first.id: 7, second.id: 1})
+
+    def test_update_rejects_malformed_items(self):
+        first, _ = self.product_infos
+        self.add((first, 2))
+        order_item = OrderItem.objects.get()
+
+        for items in (
+            "{}",
+            "[1]",
+            dump_json([{"id": order_item.id}]).decode(),
+            dump_json([{"quantity": 3}]).decode(),
+            dump_json([{"id": str(order_item.id), "quantity": 3}]).decode(),
+        ):
+            with self.subTest(items=items):
+                self.assertEqual(
+                    self.update(items),
+                    {"Status": False, "Errors": "Invalid request format"},
+                )
+
+        self.assertEqual(self.basket_items(), {first.id: 2})
+
+    def test_update_leaves_other_baskets_alone(self):
+        first, _ = self.product_infos
+        self.add((first, 2))
+        order_item = OrderItem.objects.get()
+
+        other = User.objects.create_user(username="other", email="other@example.com")
+        self.client.force_authenticate(other)
+        response = self.update(
+            dump_json([{"id": order_item.id, "quantity": 9}]).decode()
+        )
+        self.assertEqual(response, {"Status": True, "Updated objects": 0})
+        self.assertEqual(self.basket_items(), {first.id: 2})
+
+    def test_delete(self):
+        first, second = self.product_infos
+        self.add((first, 2), (second, 1))
+        order_item = OrderItem.objects.get(product=first)
+
+        response = self.client.delete(
+            "/api/v1/basket", {"items": f"{order_item.id},abc"}
+        ).json()
+        self.assertEqual(response, {"Status": True, "Deleted objects": 1})
+        self.assertEqual(self.basket_items(), {second.id: 1})
+
+    def test_delete_contacts(self):
+        other = Contact.objects.create(
+            user=self.user, address="Тверь", phone="+79990000003"
+        )
+        foreign = Contact.objects.exclude(user=self.user).first()
+
+        response = self.client.delete(
+            "/api/v1/user/contact", {"items": f"{other.id},{foreign.id}"}
+        ).json()
+        self.assertEqual(response, {"Status": True, "Deleted objects": 1})
+        self.assertTrue(Contact.objects.filter(id=foreign.id).exists())
+        self.assertFalse(Contact.objects.filter(id=other.id).exists())
+
+    def test_update_rejects_out_of_range_quantity(self):
+        first, _ = self.product_infos
+        self.add((first, 2))
+        order_item = OrderItem.objects.get()
+
+        for quantity in (0, 40000):
+            with self.subTest(quantity=quantity):
+                response = self.update(
+                    dump_json([{"id": order_item.id, "quantity": quantity}]).decode()
+                )
+                self.assertFalse(response["Status"])
+
+        self.assertEqual(self.basket_items(), {first.id: 2})
+
+    def test_detail_and_summary(self):
+        first, second = self.product_infos
+        self.add((first, 2), (second, 1))
+
+        response = self.client.get("/api/v1/basket/detail")
+        self.assertEqual(response.status_code, 200)
+        (basket,) = response.json()
+        self.assertEqual(basket["total_sum"], 2 * 100 + 1 * 200)
+        self.assertEqual(basket["contact"]["id"], self.contact.id)
+        self.assertEqual(
+            {item["product_info"]["id"] for item in basket["ordered_items"]},
+            {first.id, second.id},
+        )
+
+        response = self.client.get("/api/v1/basket/summary")
+        self.assertEqual(
+            response.json(), [{"id": basket["id"], "state": "basket", "total_sum": 400}]
+        )
+
+    def test_baskets_are_not_shared_between_users(self):
+        first, _ = self.product_infos
+        self.add((first, 2))
+
+        # This seller contact has the buyer's user id as its primary key.
+        seller_user = User.objects.get(username="seller")
+        self.client.force_authenticate(seller_user)
+        self.assertEqual(self.client.get("/api/v1/basket").json(), [])
+        self.assertEqual(self.client.get("/api/v1/basket/summary").json(), [])
+
+    def test_checkout(self):
+        first, _ = self.product_infos
+        self.add((first, 2))
+        basket = Order.objects.get(state="basket")
+        contact = Contact.objects.create(
+            user=self.user, address="Тверь", phone="+79990000003"
+        )
+        foreign = Contact.objects.exclude(user=self.user).first()
+
+        response = self.client.post(
+            "/api/v1/order", {"id": str(basket.id), "contact": str(foreign.id)}
+        ).json()
+        self.assertFalse(response["Status"])
+
+        response = self.client.post(
+            "/api/v1/order", {"id": str(basket.id), "contact": str(contact.id)}
+        ).json()
+        self.assertEqual(response, {"Status": True})
+        basket.refresh_from_db()
+        self.assertEqual((basket.state, basket.user_id), ("new", contact.id))
+        self.assertEqual(len(mail.outbox), 1)
+
+        (order,) = self.client.get("/api/v1/order").json()
+        self.assertEqual((order["id"], order["total_sum"]), (basket.id, 200))
+
+        self.client.force_authenticate(User.objects.get(username="seller"))
+        (order,) = self.client.get("/api/v1/seller/orders").json()
+        self.assertEqual(order["contact"]["id"], contact.id)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class LogInViewTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="buyer", email="Buyer@Example.com", password="Pa55-word!"
+        )
+
+    def log_in(self, email, password="Pa55-word!"):
+        return (
+            APIClient()
+            .post("/api/v1/user/login", {"email": email, "password": password})
+            .json()
+        )
+
+    def test_email_is_stored_lowercase(self):
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.email, "buyer@example.com")
+
+    def test_log_in_with_any_email_case(self):
+        for email in ("buyer@example.com", "BUYER@example.COM"):
+            with self.subTest(email=email):
+                response = self.log_in(email)
+                self.assertTrue(response["Status"])
+                self.assertIn("Token", response)
+
+    def test_wrong_password_or_unknown_email(self):
+        self.assertFalse(self.log_in("buyer@example.com", "wrong")["Status"])
+        self.assertFalse(self.log_in("nobody@example.com")["Status"])
+
+    def test_username_log_in_skips_the_email_backend(self):
+        with self.assertNumQueries(0):
+            self.assertIsNone(
+                EmailBackend().authenticate(
+                    None, username="buyer", password="Pa55-word!"
+                )
+            )
+        self.assertEqual(
+            EmailBackend().authenticate(
+                None, username="BUYER@example.com", password="Pa55-word!"
+            ),
+            self.user,
+        )
+
+    def test_register_rejects_email_differing_only_by_case(self):
+        response = (
+            APIClient()
+            .post(
+                "/api/v1/user/register",
+                {
+                    "email": "BUYER@example.com",
+                    "password": "Pa55-word!",
+                    "type": "buyer",
+                },
+            )
+            .json()
+        )
+        self.assertFalse(response["Status"])
+        self.assertIn("email", response["Errors"])
+
+    def test_confirm_with_any_email_case(self):
+        token = ConfirmEmailToken.objects.create(user=self.user)
+        response = (
+            APIClient()
+            .post(
+                "/api/v1/user/register/confirm",
+                {"email": "BUYER@Example.com", "token": token.key},
+            )
+            .json()
+        )
+        self.assertEqual(response, {"Status": True})
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ListCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def category_names(self):
+        response = self.client.get("/api/v1/categories")
+        return [category["name"] for category in response.json()["results"]]
+
+    def test_saving_a_category_refreshes_the_list_after_commit(self):
+        self.assertEqual(self.category_names(), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(name="Смартфоны")
+        self.assertEqual(self.category_names(), ["Смартфоны"])
+
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            Category.objects.create(name="Планшеты")
+        self.assertEqual(self.category_names(), ["Смартфоны"])
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.category_names(), ["Смартфоны", "Планшеты"])
+
+    def test_seller_state_change_refreshes_the_seller_list(self):
+        user = User.objects.create_user(
+            username="seller", email="seller@example.com", type="seller"
+        )
+        Seller.objects.create(name="Связной", user=user, state=True)
+        self.assertEqual(self.client.get("/api/v1/sellers").json()["count"], 1)
+
+        seller_client = APIClient()
+        seller_client.force_authenticate(user)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = seller_client.post("/api/v1/seller/state", {"state": "off"})
+        self.assertEqual(response.json(), {"Status": True})
+        self.assertEqual(self.client.get("/api/v1/sellers").json()["count"], 0)
+
+    def test_pagination_links_are_built_per_request(self):
+        Category.objects.bulk_create(
+            [Category(name=f"Категория {number}") for number in range(41)]
+        )
+
+        response = self.client.get(
+            "/api/v1/categories", {"format": "json"}, HTTP_HOST="a.example.com"
+        )
+        self.assertEqual(
+            response.json()["next"],
+            "http://a.example.com/api/v1/categories?format=json&page=2",
+        )
+
+        for _ in range(2):
+            response = self.client.get("/api/v1/categories", HTTP_HOST="b.example.com")
+            data = response.json()
+            self.assertEqual(data["count"], 41)
+            self.assertEqual(
+                data["next"], "http://b.example.com/api/v1/categories?page=2"
+            )
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class PermissionTests(TestCase):
+    def test_anonymous_requests_get_401(self):
+        client = APIClient()
+        for method, path in (
+            ("get", "/api/v1/basket"),
+            ("get", "/api/v1/basket/summary"),
+            ("get", "/api/v1/order"),
+            ("get", "/api/v1/user/contact"),
+            ("get", "/api/v1/user/details"),
+            ("post", "/api/v1/seller/update"),
+        ):
+            with self.subTest(path=path):
+                response = getattr(client, method)(path)
+                self.assertEqual(response.status_code, 401)
+
+    def test_buyers_get_403_on_seller_routes(self):
+        client = APIClient()
+        client.force_authenticate(
+            User.objects.create_user(username="buyer", email="buyer@example.com")
+        )
+        for method, path in (
+            ("post", "/api/v1/seller/update"),
+            ("get", "/api/v1/seller/state"),
+            ("post", "/api/v1/seller/state"),
+            ("get", "/api/v1/seller/orders"),
+        ):
+            with self.subTest(path=path):
+                response = getattr(client, method)(path)
+                self.assertEqual(response.status_code, 403)
+                self.assertEqual(response.json(), {"detail": "Only for sellers"})
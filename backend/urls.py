@@ -1,4 +1,4 @@
-from django.urls import path
+from django.urls import path, include
 
 from django_rest_passwordreset.views import (
     reset_password_request_token,
@@ -13,6 +13,7 @@ from backend.views import (
     SellerView,
     ProductInfoView,
     BasketView,
+    BasketSummaryView,
     UserDetailsView,
     ContactView,
     OrderView,
@@ -24,26 +25,34 @@ from backend.views import (
 
 app_name = "backend"
 
-urlpatterns = [
-    path("seller/update", CatalogView.as_view(), name="seller-update"),
-    path("seller/state", SellerStateView.as_view(), name="seller-state"),
-    path("seller/orders", SellerOrdersView.as_view(), name="seller-orders"),
-    path("user/register", SignInView.as_view(), name="user-register"),
-    path(
-        "user/register/confirm", ConfirmUserView.as_view(), name="user-register-confirm"
-    ),
-    path("user/details", UserDetailsView.as_view(), name="user-details"),
-    path("user/contact", ContactView.as_view(), name="user-contact"),
-    path("user/login", LogInView.as_view(), name="user-login"),
-    path("user/password_reset", reset_password_request_token, name="password-reset"),
+seller_patterns = [
+    path("update", CatalogView.as_view(), name="seller-update"),
+    path("state", SellerStateView.as_view(), name="seller-state"),
+    path("orders", SellerOrdersView.as_view(), name="seller-orders"),
+]
+
+user_patterns = [
+    path("register", SignInView.as_view(), name="user-register"),
+    path("register/confirm", ConfirmUserView.as_view(), name="user-register-confirm"),
+    path("details", UserDetailsView.as_view(), name="user-details"),
+    path("contact", ContactView.as_view(), name="user-contact"),
+    path("login", LogInView.as_view(), name="user-login"),
+    path("password_reset", reset_password_request_token, name="password-reset"),
     path(
-        "user/password_reset/confirm",
+        "password_reset/confirm",
         reset_password_confirm,
         name="password-reset-confirm",
     ),
+]
+
+urlpatterns = [
+    path("seller/", include(seller_patterns)),
+    path("user/", include(user_patterns)),
     path("categories", CategoryView.as_view(), name="categories"),
     path("sellers", SellerView.as_view(), name="sellers"),
     path("products", ProductInfoView.as_view(), name="sellers"),
     path("basket", BasketView.as_view(), name="basket"),
+    path("basket/detail", BasketView.as_view(), name="basket-detail"),
+    path("basket/summary", BasketSummaryView.as_view(), name="basket-summary"),
     path("order", OrderView.as_view(), name="order"),
 ]
@@ -1,39 +1,48 @@
-from requests import get
-from yaml import load as load_yaml, Loader
-from ujson import loads as load_json
-from distutils.util import strtobool
-
-from django.http import JsonResponse
+from requests import Session, RequestException
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import HTTPError as TransportError
+from yaml import load as load_yaml, YAMLError
+from orjson import loads as load_json, dumps as dump_json
+
+try:
+    from yaml import CSafeLoader as Loader
+except ImportError:
+    from yaml import SafeLoader as Loader
+
+from django.http import HttpResponse, JsonResponse
+from django.core.cache import cache
+from django.core.paginator import Paginator
 from django.core.validators import URLValidator
 from django.core.exceptions import ValidationError
 from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
 from django.db.models import Q, Sum, F
 
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.generics import ListAPIView
+from rest_framework.permissions import IsAuthenticated
 from rest_framework.authtoken.models import Token
 
+from backend.cache import LIST_CACHE_TIMEOUT, list_cache_key, invalidate_list_cache
+from backend.permissions import IsSeller
 from backend.signals import new_user_registered, new_order
 from backend.models import (
     Seller,
     Product,
     ProductInfo,
     Category,
-    Parameter,
-    ProductParameter,
     Order,
     OrderItem,
     Contact,
     ConfirmEmailToken,
+    MAX_QUANTITY,
 )
 from backend.serializers import (
     UserSerializer,
     ProductSerializer,
     ProductInfoSerializer,
-    OrderItemSerializer,
     OrderSerializer,
     SellerSerializer,
     ContactSerializer,
@@ -41,65 +50,163 @@ from backend.serializers import (
 )
 
 
+SESSION = Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=10, pool_maxsize=20))
+SESSION.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=20))
+
+validate_url = URLValidator()
+
+CATALOG_KEYS = {"seller", "categories", "goods"}
+
+BOOLEAN_VALUES = {
+    "y": True,
+    "yes": True,
+    "t": True,
+    "true": True,
+    "on": True,
+    "1": True,
+    "n": False,
+    "no": False,
+    "f": False,
+    "false": False,
+    "off": False,
+    "0": False,
+}
+
+
+def strtobool(value):
+    try:
+        return BOOLEAN_VALUES[value.strip().lower()]
+    except KeyError:
+        raise ValueError(f"invalid truth value {value!r}")
+
+
+class ORJSONResponse(HttpResponse):
+    def __init__(self, data, **kwargs):
+        kwargs.setdefault("content_type", "application/json")
+        super().__init__(dump_json(data), **kwargs)
+
+
 class CatalogView(APIView):
-    def post(self, request, *args, **kwargs):
-        if not request.user.is_authenticated:
-            return JsonResponse(
-                {"Status": False, "Error": "Log in required"}, status=403
-            )
-        if request.user.type != "seller":
-            return JsonResponse(
-                {"Status": False, "Error": "Only for sellers"}, status=403
-            )
+    permission_classes = [IsSeller]
 
+    def post(self, request, *args, **kwargs):
         url = request.data.get("url")
 
         if url:
-            validate_url = URLValidator()
-
             try:
                 validate_url(url)
             except ValidationError as e:
                 return JsonResponse({"Status": False, "Error": str(e)})
 
-            stream = get(url).content
-            data = load_yaml(stream, Loader=Loader)
+            try:
+                with SESSION.get(url, timeout=(5, 30), stream=True) as response:
+                    response.raise_for_status()
+                    response.raw.decode_content = True
+                    data = load_yaml(response.raw, Loader=Loader)
+            except (RequestException, TransportError, YAMLError) as e:
+                return JsonResponse({"Status": False, "Error": str(e)})
 
-            seller, _ = Seller.objects.get_or_create(
-                name=data["seller"], user_id=request.user.id
-            )
+            if type(data) != dict or not CATALOG_KEYS.issubset(data):
+                return JsonResponse(
+                    {"Status": False, "Error": "Invalid catalog format"}
+                )
 
-            for category in data["categories"]:
-                category_object, _ = Category.objects.get_or_create(
-                    id=category["id"], name=category["name"]
+            if not all(
+                type(item["quantity"]) == int and 0 <= item["quantity"] <= MAX_QUANTITY
+                for item in data["goods"]
+            ):
+                return JsonResponse(
+                    {
+                        "Status": False,
+                        "Errors": f"Quantity must be between 0 and {MAX_QUANTITY}",
+                    }
                 )
-                category_object.sellers.add(seller.id)
-                category_object.save()
 
-            ProductInfo.objects.filter(seller_id=seller.id).delete()
+            with transaction.atomic():
+                seller, _ = Seller.objects.get_or_create(
+                    name=data["seller"], user_id=request.user.id
+                )
 
-            for item in data["goods"]:
-                product, _ = Product.objects.get_or_create(
-                    name=item["name"], category_id=item["category"]
+                category_ids = {category["id"] for category in data["categories"]}
+                existing_category_ids = set(
+                    Category.objects.filter(id__in=category_ids).values_list(
+                        "id", flat=True
+                    )
                 )
-                product_info = ProductInfo.objects.create(
-                    name=item["model"],
-                    product_id=product.id,
-                    seller_id=seller.id,
-                    quantity=item["quantity"],
-                    price=item["price"],
-                    price_rrc=item["price_rrc"],
-                    article=item["id"],
+                Category.objects.bulk_create(
+                    [
+                        Category(id=category["id"], name=category["name"])
+                        for category in data["categories"]
+                        if category["id"] not in existing_category_ids
+                    ],
+                    ignore_conflicts=True,
+                )
+                CategorySeller = Category.shops.through
+                CategorySeller.objects.bulk_create(
+                    [
+                        CategorySeller(category_id=category_id, seller_id=seller.id)
+                        for category_id in category_ids
+                    ],
+                    ignore_conflicts=True,
                 )
 
-                for name, value in item["parameters"].items():
-                    parameter_object, _ = Parameter.objects.get_or_create(name=name)
-                    ProductParameter.objects.create(
-                        product_info_id=product_info.id,
-                        parameter_id=parameter_object.id,
-                        value=value,
+                product_keys = {
+                    (item["name"], item["category"]) for item in data["goods"]
+                }
+                product_ids = {
+                    (name, category_id): product_id
+                    for name, category_id, product_id in Product.objects.filter(
+                        name__in={name for name, _ in product_keys},
+                        category_id__in={
+                            category_id for _, category_id in product_keys
+                        },
+                    ).values_list("name", "category_id", "id")
+                }
+                for product in Product.objects.bulk_create(
+                    [
+                        Product(name=name, category_id=category_id)
+                        for name, category_id in product_keys - product_ids.keys()
+                    ],
+                    batch_size=1000,
+                ):
+                    product_ids[(product.name, product.category_id)] = product.id
+
+                product_infos = {
+                    item["id"]: ProductInfo(
+                        name=item["model"],
+                        product_id=product_ids[(item["name"], item["category"])],
+                        seller_id=seller.id,
+                        quantity=item["quantity"],
+                        price=item["price"],
+                        price_rrc=item["price_rrc"],
+                        article=item["id"],
+                        parameters={
+                            name: str(value)
+                            for name, value in item["parameters"].items()
+                        },
                     )
+                    for item in data["goods"]
+                }
+                ProductInfo.objects.bulk_create(
+                    product_infos.values(),
+                    update_conflicts=True,
+                    unique_fields=["seller", "article"],
+                    update_fields=[
+                        "name",
+                        "product",
+                        "quantity",
+                        "price",
+                        "price_rrc",
+                        "parameters",
+                    ],
+                    batch_size=1000,
+                )
+                ProductInfo.objects.filter(seller_id=seller.id).exclude(
+                    article__in=product_infos.keys()
+                ).delete()
 
+            invalidate_list_cache("categories", "products")
             return JsonResponse({"Status": True})
 
         return JsonResponse(
@@ -112,7 +219,7 @@ class LogInView(APIView):
         if {"email", "password"}.issubset(request.data):
             user = authenticate(
                 request,
-                username=request.data["email"],
+                email=request.data["email"],
                 password=request.data["password"],
             )
 
@@ -167,7 +274,7 @@ class ConfirmUserView(APIView):
     def post(self, request, *args, **kwargs):
         if {"email", "token"}.issubset(request.data):
             token = ConfirmEmailToken.objects.filter(
-                user__email=request.data["email"], key=request.data["token"]
+                user__email__iexact=request.data["email"], key=request.data["token"]
             ).first()
             if token:
                 token.user.is_active = True
@@ -188,21 +295,13 @@ class ConfirmUserView(APIView):
 
 
 class UserDetailsView(APIView):
-    def get(self, request, *args, **kwargs):
-        if not request.user.is_authenticated:
-            return JsonResponse(
-                {"Status": False, "Error": "Log in required"}, status=403
-            )
+    permission_classes = [IsAuthenticated]
 
+    def get(self, request, *args, **kwargs):
         serializer = UserSerializer(request.user)
         return Response(serializer.data)
 
     def post(self, request, *args, **kwargs):
-        if not request.user.is_authenticated:
-            return JsonResponse(
-                {"Status": False, "Error": "Log in required"}, status=403
-            )
-
         if "password" in request.data:
             try:
                 validate_password(request.data["password"])
@@ -224,19 +323,51 @@ class UserDetailsView(APIView):
             return JsonResponse({"Status": False, "Errors": user_serializer.errors})
 
 
-class CategoryView(ListAPIView):
-    queryset = Category.objects.all()
+class CachedListMixin:
+    cache_name = None
+
+    def list(self, request, *args, **kwargs):
+        page = request.query_params.get(self.paginator.page_query_param, "1")
+        if not page.isdigit():
+            return super().list(request, *args, **kwargs)
+
+        key = list_cache_key(self.cache_name, page)
+        data = cache.get(key)
+
+        if data is None:
+            response = super().list(request, *args, **kwargs)
+            cache.set(
+                key,
+                {"count": response.data["count"], "results": response.data["results"]},
+                LIST_CACHE_TIMEOUT,
+            )
+            return response
+
+        # Only the count and the rows are cached, the next and previous links
+        # are built for the current request.
+        self.paginator.request = request
+        self.paginator.page = Paginator(
+            range(data["count"]), self.paginator.get_page_size(request)
+        ).page(page)
+        return self.paginator.get_paginated_response(data["results"])
+
+
+class CategoryView(CachedListMixin, ListAPIView):
+    queryset = Category.objects.order_by("id")
     serializer_class = CategorySerializer
+    cache_name = "categories"
 
 
-class ProductView(ListAPIView):
-    queryset = Product.objects.all()
+class ProductView(CachedListMixin, ListAPIView):
+    queryset = Product.objects.select_related("category").order_by("id")
     serializer_class = ProductSerializer
+    cache_name = "products"
 
 
-class SellerView(ListAPIView):
-    queryset = Seller.objects.filter(state=True)
+class SellerView(CachedListMixin, ListAPIView):
+    queryset = Seller.objects.filter(state=True).order_by("id")
     serializer_class = SellerSerializer
+    cache_name = "sellers"
 
 
 class ProductInfoView(APIView):
@@ -252,9 +383,18 @@ class ProductInfoView(APIView):
 
         queryset = (
             ProductInfo.objects.filter(query)
-            .select_related("seller", "product__category")
-            .prefetch_related("product_parameters__parameter")
-            .distinct()
+            .select_related("product__category")
+            .only(
+                "id",
+                "name",
+                "seller_id",
+                "quantity",
+                "price",
+                "price_rrc",
+                "parameters",
+                "product__name",
+                "product__category__name",
+            )
         )
 
         serializer = ProductInfoSerializer(queryset, many=True)
@@ -263,22 +403,40 @@ class ProductInfoView(APIView):
 
 
 class BasketView(APIView):
-    def get(self, request, *args, **kwargs):
-        if not request.user.is_authenticated:
-            return JsonResponse(
-                {"Status": False, "Error": "Log in required"}, status=403
-            )
+    permission_classes = [IsAuthenticated]
+
+    @staticmethod
+    def get_basket_id(request, create=False):
+        if getattr(request, "basket_id", None) is None:
+            basket_id = (
+                Order.objects.filter(user__user_id=request.user.id, state="basket")
+                .values_list("id", flat=True)
+                .first()
+            )
+            if basket_id is None and create:
+                # Order.user points at the buyer's contact, so a new basket
+                # is attached to the first contact of the user.
+                contact_id = (
+                    Contact.objects.filter(user_id=request.user.id)
+                    .order_by("id")
+                    .values_list("id", flat=True)
+                    .first()
+                )
+                if contact_id is not None:
+                    basket, _ = Order.objects.get_or_create(
+                        user_id=contact_id, state="basket"
+                    )
+                    basket_id = basket.id
+            request.basket_id = basket_id
+        return request.basket_id
 
+    def get(self, request, *args, **kwargs):
         basket = (
-            Order.objects.filter(user_id=request.user.id, state="basket")
-            .prefetch_related(
-                "ordered_items__product_info__product__category",
-                "ordered_items__product_info__product_parameters__parameter",
-            )
+            Order.objects.filter(user__user_id=request.user.id, state="basket")
+            .prefetch_related("ordered_items__product__product__category")
             .annotate(
                 total_sum=Sum(
-                    F("ordered_items__quantity")
-                    * F("ordered_items__product_info__price")
+                    F("ordered_items__quantity") * F("ordered_items__product__price")
                 )
             )
             .distinct()
@@ -289,144 +447,176 @@ class BasketView(APIView):
         return Response(serializer.data)
 
     def post(self, request, *args, **kwargs):
-        if not request.user.is_authenticated:
-            return JsonResponse(
-                {"Status": False, "Error": "Log in required"}, status=403
-            )
-
         items_string = request.data.get("items")
 
         if items_string:
             try:
                 items_dict = load_json(items_string)
             except ValueError:
-                JsonResponse({"Status": False, "Errors": "Invalid request format"})
-
-            basket, _ = Order.objects.get_or_create(
-                user_id=request.user.id, state="basket"
-            )
-            objects_created = 0
-
-            for order_item in items_dict:
-                order_item.update({"order": basket.id})
-                serializer = OrderItemSerializer(data=order_item)
-
-                if serializer.is_valid():
-                    try:
-                        serializer.save()
-                    except IntegrityError as error:
-                        return JsonResponse({"Status": False, "Errors": str(error)})
+                return ORJSONResponse(
+                    {"Status": False, "Errors": "Invalid request format"}
+                )
 
-                    objects_created += 1
+            if type(items_dict) != list or not all(
+                type(order_item) == dict
+                and type(order_item.get("product_info")) == int
+                and type(order_item.get("quantity")) == int
+                and 0 < order_item["quantity"] <= MAX_QUANTITY
+                for order_item in items_dict
+            ):
+                return ORJSONResponse(
+                    {"Status": False, "Errors": "Invalid request format"}
+                )
 
-                else:
-                    JsonResponse({"Status": False, "Errors": serializer.errors})
+            basket_id = self.get_basket_id(request, create=True)
+            if basket_id is None:
+                return ORJSONResponse(
+                    {"Status": False, "Errors": "Contact is not specified"}
+                )
 
-                return JsonResponse(
-                    {"Status": True, "Created objects": objects_created}
+            quantities = {
+                order_item["product_info"]: order_item["quantity"]
+                for order_item in items_dict
+            }
+            sellers = dict(
+                ProductInfo.objects.filter(id__in=quantities).values_list(
+                    "id", "seller_id"
                 )
+            )
 
-        return JsonResponse(
+            try:
+                with transaction.atomic():
+                    # Locking the basket serialises concurrent adds, so the
+                    # pre-check below sees every committed row and the number
+                    # of created objects is exact.
+                    Order.objects.select_for_update().only("id").get(id=basket_id)
+                    existing = set(
+                        OrderItem.objects.filter(
+                            order_id=basket_id, product_id__in=sellers
+                        ).values_list("product_id", flat=True)
+                    )
+                    order_items = [
+                        OrderItem(
+                            order_id=basket_id,
+                            product_id=product_id,
+                            shop_id=seller_id,
+                            quantity=quantities[product_id],
+                        )
+                        for product_id, seller_id in sellers.items()
+                        if product_id not in existing
+                    ]
+                    OrderItem.objects.bulk_create(order_items, batch_size=500)
+            except IntegrityError as error:
+                return ORJSONResponse({"Status": False, "Errors": str(error)})
+
+            return ORJSONResponse({"Status": True, "Created objects": len(order_items)})
+
+        return ORJSONResponse(
             {"Status": False, "Errors": "Necessary arguments are not specified"}
         )
 
     def delete(self, request, *args, **kwargs):
-        if not request.user.is_authenticated:
-            return JsonResponse(
-                {"Status": False, "Error": "Log in required"}, status=403
-            )
-
         items_string = request.data.get("items")
 
         if items_string:
-            items_list = items_string.split(",")
-            basket, _ = Order.objects.get_or_create(
-                user_id=request.user.id, state="basket"
-            )
-            query = Q()
-            objects_deleted = False
-
-            for order_item_id in items_list:
-                if order_item_id.isdigit():
-                    query = query | Q(order_id=basket.id, id=order_item_id)
-                    objects_deleted = True
-
-            if objects_deleted:
-                deleted_count = OrderItem.objects.filter(query).delete()[0]
-
-                return JsonResponse({"Status": True, "Deleted objects": deleted_count})
+            items_ids = [
+                int(order_item_id)
+                for order_item_id in items_string.split(",")
+                if order_item_id.isdigit()
+            ]
+
+            if items_ids:
+                deleted_count = OrderItem.objects.filter(
+                    order_id=self.get_basket_id(request), id__in=items_ids
+                ).delete()[0]
+
+                return ORJSONResponse(
+                    {"Status": True, "Deleted objects": deleted_count}
+                )
 
-        return JsonResponse(
+        return ORJSONResponse(
             {"Status": False, "Errors": "Necessary arguments are not specified"}
         )
 
     def put(self, request, *args, **kwargs):
-        if not request.user.is_authenticated:
-            return JsonResponse(
-                {"Status": False, "Error": "Log in required"}, status=403
-            )
-
         items_string = request.data.get("items")
 
         if items_string:
             try:
                 items_dict = load_json(items_string)
             except ValueError:
-                JsonResponse({"Status": False, "Errors": "Invalid request format"})
+                return ORJSONResponse(
+                    {"Status": False, "Errors": "Invalid request format"}
+                )
 
-            basket, _ = Order.objects.get_or_create(
-                user_id=request.user.id, state="basket"
+            if type(items_dict) != list or not all(
+                type(order_item) == dict
+                and type(order_item.get("id")) == int
+                and type(order_item.get("quantity")) == int
+                and 0 < order_item["quantity"] <= MAX_QUANTITY
+                for order_item in items_dict
+            ):
+                return ORJSONResponse(
+                    {"Status": False, "Errors": "Invalid request format"}
+                )
+
+            basket_id = self.get_basket_id(request)
+            quantities = {
+                order_item["id"]: order_item["quantity"] for order_item in items_dict
+            }
+            order_items = list(
+                OrderItem.objects.filter(order_id=basket_id, id__in=quantities).only(
+                    "id", "quantity"
+                )
             )
-            objects_updated = 0
 
-            for order_item in items_dict:
-                if (
-                    type(order_item["id"]) == int
-                    and type(order_item["quantity"]) == int
-                ):
-                    objects_updated += OrderItem.objects.filter(
-                        order_id=basket.id, id=order_item["id"]
-                    ).update(quantity=order_item["quantity"])
+            for order_item in order_items:
+                order_item.quantity = quantities[order_item.id]
 
-            return JsonResponse({"Status": True, "Updated objects": objects_updated})
+            objects_updated = OrderItem.objects.bulk_update(
+                order_items, ["quantity"], batch_size=500
+            )
 
-        return JsonResponse(
+            return ORJSONResponse({"Status": True, "Updated objects": objects_updated})
+
+        return ORJSONResponse(
             {"Status": False, "Errors": "Necessary arguments are not specified"}
         )
 
 
-class SellerStateView(APIView):
+class BasketSummaryView(APIView):
+    permission_classes = [IsAuthenticated]
+
     def get(self, request, *args, **kwargs):
-        if not request.user.is_authenticated:
-            return JsonResponse(
-                {"Status": False, "Error": "Log in required"}, status=403
+        basket = (
+            Order.objects.filter(user__user_id=request.user.id, state="basket")
+            .annotate(
+                total_sum=Sum(
+                    F("ordered_items__quantity") * F("ordered_items__product__price")
+                )
             )
+            .values("id", "state", "total_sum")
+        )
 
-        if request.user.type != "seller":
-            return JsonResponse(
-                {"Status": False, "Error": "Only for sellers"}, status=403
-            )
+        return Response(list(basket))
 
+
+class SellerStateView(APIView):
+    permission_classes = [IsSeller]
+
+    def get(self, request, *args, **kwargs):
         sellers = request.user.sellers
         serializer = SellerSerializer(sellers)
         return Response(serializer.data)
 
     def post(self, request, *args, **kwargs):
-        if not request.user.is_authenticated:
-            return JsonResponse(
-                {"Status": False, "Error": "Log in required"}, status=403
-            )
-
-        if request.user.type != "seller":
-            return JsonResponse(
-                {"Status": False, "Error": "Only for sellers"}, status=403
-            )
         state = request.data.get("state")
         if state:
             try:
                 Seller.objects.filter(user_id=request.user.id).update(
                     state=strtobool(state)
                 )
+                invalidate_list_cache("sellers")
                 return JsonResponse({"Status": True})
             except ValueError as error:
                 return JsonResponse({"Status": False, "Errors": str(error)})
@@ -437,31 +627,19 @@ class SellerStateView(APIView):
 
 
 class SellerOrdersView(APIView):
-    def get(self, request, *args, **kwargs):
-        if not request.user.is_authenticated:
-            return JsonResponse(
-                {"Status": False, "Error": "Log in required"}, status=403
-            )
-
-        if request.user.type != "seller":
-            return JsonResponse(
-                {"Status": False, "Error": "Only for sellers"}, status=403
-            )
+    permission_classes = [IsSeller]
 
+    def get(self, request, *args, **kwargs):
         order = (
             Order.objects.filter(
-                ordered_items__product_info__seller__user_id=request.user.id
+                ordered_items__product__seller__user_id=request.user.id
             )
             .exclude(state="basket")
-            .prefetch_related(
-                "ordered_items__product_info__product__category",
-                "ordered_items__product_info__product_parameters__parameter",
-            )
-            .select_related("contact")
+            .prefetch_related("ordered_items__product__product__category")
+            .select_related("user")
             .annotate(
                 total_sum=Sum(
-                    F("ordered_items__quantity")
-                    * F("ordered_items__product_info__price")
+                    F("ordered_items__quantity") * F("ordered_items__product__price")
                 )
             )
             .distinct()
@@ -472,21 +650,14 @@ class SellerOrdersView(APIView):
 
 
 class ContactView(APIView):
+    permission_classes = [IsAuthenticated]
+
     def get(self, request, *args, **kwargs):
-        if not request.user.is_authenticated:
-            return JsonResponse(
-                {"Status": False, "Error": "Log in required"}, status=403
-            )
         contact = Contact.objects.filter(user_id=request.user.id)
         serializer = ContactSerializer(contact, many=True)
         return Response(serializer.data)
 
     def post(self, request, *args, **kwargs):
-        if not request.user.is_authenticated:
-            return JsonResponse(
-                {"Status": False, "Error": "Log in required"}, status=403
-            )
-
         if {"address", "phone"}.issubset(request.data):
             request.data._mutable = True
             request.data.update({"user": request.user.id})
@@ -503,34 +674,24 @@ class ContactView(APIView):
         )
 
     def delete(self, request, *args, **kwargs):
-        if not request.user.is_authenticated:
-            return JsonResponse(
-                {"Status": False, "Error": "Log in required"}, status=403
-            )
-
         items_string = request.data.get("items")
         if items_string:
-            items_list = items_string.split(",")
-            query = Q()
-            objects_deleted = False
-            for contact_id in items_list:
-                if contact_id.isdigit():
-                    query = query | Q(user_id=request.user.id, id=contact_id)
-                    objects_deleted = True
-
-            if objects_deleted:
-                deleted_count = Contact.objects.filter(query).delete()[0]
+            items_ids = [
+                int(contact_id)
+                for contact_id in items_string.split(",")
+                if contact_id.isdigit()
+            ]
+
+            if items_ids:
+                deleted_count = Contact.objects.filter(
+                    user_id=request.user.id, id__in=items_ids
+                ).delete()[0]
                 return JsonResponse({"Status": True, "Deleted objects": deleted_count})
         return JsonResponse(
             {"Status": False, "Errors": "Necessary arguments are not specified"}
         )
 
     def put(self, request, *args, **kwargs):
-        if not request.user.is_authenticated:
-            return JsonResponse(
-                {"Status": False, "Error": "Log in required"}, status=403
-            )
-
         if "id" in request.data:
             if request.data["id"].isdigit():
                 contact = Contact.objects.filter(
@@ -552,23 +713,17 @@ class ContactView(APIView):
 
 
 class OrderView(APIView):
+    permission_classes = [IsAuthenticated]
+
     def get(self, request, *args, **kwargs):
-        if not request.user.is_authenticated:
-            return JsonResponse(
-                {"Status": False, "Error": "Log in required"}, status=403
-            )
         order = (
-            Order.objects.filter(user_id=request.user.id)
+            Order.objects.filter(user__user_id=request.user.id)
             .exclude(state="basket")
-            .prefetch_related(
-                "ordered_items__product_info__product__category",
-                "ordered_items__product_info__product_parameters__parameter",
-            )
-            .select_related("contact")
+            .prefetch_related("ordered_items__product__product__category")
+            .select_related("user")
             .annotate(
                 total_sum=Sum(
-                    F("ordered_items__quantity")
-                    * F("ordered_items__product_info__price")
+                    F("ordered_items__quantity") * F("ordered_items__product__price")
                 )
             )
             .distinct()
@@ -578,29 +733,25 @@ class OrderView(APIView):
         return Response(serializer.data)
 
     def post(self, request, *args, **kwargs):
-        if not request.user.is_authenticated:
-            return JsonResponse(
-                {"Status": False, "Error": "Log in required"}, status=403
-            )
-
         if {"id", "contact"}.issubset(request.data):
-            if request.data["id"].isdigit():
-                try:
-                    is_updated = Order.objects.filter(
-                        user_id=request.user.id, id=request.data["id"]
-                    ).update(contact_id=request.data["contact"], state="new")
-                except IntegrityError:
-                    return JsonResponse(
+            if request.data["id"].isdigit() and request.data["contact"].isdigit():
+                if not Contact.objects.filter(
+                    id=request.data["contact"], user_id=request.user.id
+                ).exists():
+                    return ORJSONResponse(
                         {
                             "Status": False,
                             "Errors": "The arguments are specified incorrectly",
                         }
                     )
-                else:
-                    if is_updated:
-                        new_order.send(sender=self.__class__, user_id=request.user.id)
-                        return JsonResponse({"Status": True})
 
-        return JsonResponse(
+                is_updated = Order.objects.filter(
+                    user__user_id=request.user.id, id=request.data["id"], state="basket"
+                ).update(user_id=request.data["contact"], state="new")
+                if is_updated:
+                    new_order.send(sender=self.__class__, user_id=request.user.id)
+                    return ORJSONResponse({"Status": True})
+
+        return ORJSONResponse(
             {"Status": False, "Errors": "Necessary arguments are not specified"}
         )